@@ -1,4 +1,5 @@
 from .exceptions import EosApiException, NodeException, TransactionException
 from .transaction import Account, Authorization, Action, Transaction
+from .spool import SpoolEntry, TransactionSpool
 from .eosapi import EosApi
 from .__version__ import __version__
@@ -1,8 +1,36 @@
 from .transaction import Account, Authorization, Action, Transaction
-import requests
 import functools
-from typing import List, Dict, Union
-from .exceptions import TransactionException, NodeException
+import dataclasses
+import hashlib
+from typing import TYPE_CHECKING, List, Dict, Union, Iterable, Callable
+from .spool import TransactionSpool
+from .exceptions import EosApiException, TransactionException, NodeException
+
+if TYPE_CHECKING:
+    import requests
+
+# nodeos errors that point at a single action of a transaction
+ACTION_ERRORS = {
+    "eosio_assert_message_exception",
+    "eosio_assert_code_exception",
+    "action_validate_exception",
+    "unsatisfied_authorization",
+    "missing_auth_exception",
+    "irrelevant_auth_exception",
+    "wasm_execution_error",
+}
+
+# nodeos errors that may pass on a later try, a spooled trx failing with them stays pending
+TRANSIENT_ERRORS = {
+    "tx_cpu_usage_exceeded",
+    "tx_net_usage_exceeded",
+    "greylist_cpu_usage_exceeded",
+    "greylist_net_usage_exceeded",
+    "ram_usage_exceeded",
+    "deadline_exception",
+    "leeway_deadline_exception",
+    "tx_soft_cpu_usage_exceeded",
+}
 
 class EosApi:
 
@@ -10,10 +38,24 @@ class EosApi:
         self.rpc_host = rpc_host
         self.accounts: Dict[str, Account] = {}
         self.cpu_payer: Account = None
-        self.session = requests.Session()
-        self.session.trust_env = False
-        self.session.headers["User-Agent"] = "Mozilla/5.0"
-        self.session.request = functools.partial(self.session.request, timeout=timeout)
+        self.timeout = timeout
+        self._session: "requests.Session" = None
+
+    @property
+    def session(self) -> "requests.Session":
+        # requests is imported on the first http call, not with the package
+        if self._session is None:
+            import requests
+            session = requests.Session()
+            session.trust_env = False
+            session.headers["User-Agent"] = "Mozilla/5.0"
+            session.request = functools.partial(session.request, timeout=self.timeout)
+            self._session = session
+        return self._session
+
+    @session.setter
+    def session(self, session: "requests.Session"):
+        self._session = session
 
 
     def import_key(self, account: str, private_key: str, permission: str = "active"):
@@ -36,7 +78,7 @@ class EosApi:
     def remove_cpu_payer(self):
         self.cpu_payer = None
 
-    def post(self, url: str, post_data: Dict = None) -> requests.Response:
+    def post(self, url: str, post_data: Dict = None) -> "requests.Response":
         resp = self.session.post(url, json = post_data)
 
         if resp.status_code == 500:
@@ -66,12 +108,16 @@ class EosApi:
         return resp.json()
 
     def post_transaction(self, trx: Transaction, compression: bool = False, packed_context_free_data: str = "") -> Dict:
+        return self.post_packed_transaction(trx.pack(), trx.signatures, compression, packed_context_free_data)
+
+    def post_packed_transaction(self, packed_trx: bytes, signatures: List[str], compression: bool = False,
+                                packed_context_free_data: str = "") -> Dict:
         url = self.rpc_host + "/v1/chain/push_transaction"
         post_data = {
-            "signatures": trx.signatures,
+            "signatures": signatures,
             "compression": compression,
             "packed_context_free_data": packed_context_free_data,
-            "packed_trx": trx.pack().hex(),
+            "packed_trx": packed_trx.hex(),
         }
         resp = self.post(url, post_data)
         return resp.json()
@@ -90,7 +136,6 @@ class EosApi:
             })
 
         # create trx
-        actors = []
         actions = []
         for item in trx["actions"]:
             authorization = []
@@ -99,9 +144,6 @@ class EosApi:
                     actor=auth["actor"],
                     permission=auth["permission"]
                 ))
-                actor_premission = "{0}-{1}".format(auth["actor"], auth["permission"])
-                if actor_premission not in actors:
-                    actors.append(actor_premission)
             actions.append(Action(
                 account=item["account"],
                 name=item["name"],
@@ -119,7 +161,18 @@ class EosApi:
         net_info = self.get_info()
         trx.link(net_info["last_irreversible_block_id"], net_info["chain_id"])
 
-        # sign trx by private keys
+        self.sign_transaction(trx)
+        return trx
+
+    def sign_transaction(self, trx: Transaction):
+        # sign trx by private keys, once per key whatever the number of authorizations
+        actors = []
+        for action in trx.actions:
+            for auth in action.authorization:
+                actor_premission = "{0}-{1}".format(auth.actor, auth.permission)
+                if actor_premission not in actors:
+                    actors.append(actor_premission)
+
         signed_keys = []
         for actor_premission in actors:
             if actor_premission in self.accounts:
@@ -132,8 +185,6 @@ class EosApi:
                 trx.sign(private_key)
                 signed_keys.append(private_key)
 
-        return trx
-
     def push_transaction(self, trx: Union[Dict, Transaction], extra_signatures: Union[str, List[str]] = None) -> Dict:
         if isinstance(trx, dict):
             trx = self.make_transaction(trx)
@@ -145,3 +196,140 @@ class EosApi:
                     trx.signatures.append(item)
 
         return self.post_transaction(trx)
+
+    def drain_spool(self, spool: TransactionSpool) -> List[Dict]:
+        # broadcast every entry without a recorded result, in spool order
+        # chain rejections are recorded and never resent, node/network errors propagate
+        # and leave the entry pending, so calling again resumes where it stopped
+        # transient chain errors are returned with "retry" but not recorded, the entry stays pending
+        results = []
+        for entry in spool.pending():
+            try:
+                resp = self.post_packed_transaction(entry.packed_trx, entry.signatures)
+                result = {"transaction_id": resp.get("transaction_id")}
+            except TransactionException as e:
+                name = self.error_name(e)
+                if name == "tx_duplicate":
+                    # pushed before a crash lost its ack, the trx id is the hash of packed_trx
+                    result = {"transaction_id": hashlib.sha256(entry.packed_trx).hexdigest()}
+                elif name is None or name in TRANSIENT_ERRORS:
+                    results.append({"offset": entry.offset, "error": str(e), "retry": True})
+                    continue
+                else:
+                    result = {"error": str(e)}
+            spool.record(entry.offset, result)
+            results.append(spool.results[entry.offset])
+        return results
+
+    def make_batch_transaction(self, actions: List[Action], net_info: Dict = None) -> Transaction:
+        actions = list(actions)
+        # if cpu/net paid by another, without touching the caller's action
+        if self.cpu_payer:
+            payer = Authorization(actor=self.cpu_payer.account, permission=self.cpu_payer.permission)
+            actions[0] = dataclasses.replace(actions[0], authorization=[payer] + actions[0].authorization)
+
+        trx = Transaction(actions=actions)
+        if net_info is None:
+            net_info = self.get_info()
+        trx.link(net_info["last_irreversible_block_id"], net_info["chain_id"])
+        self.sign_transaction(trx)
+        return trx
+
+    @staticmethod
+    def error_name(e: TransactionException) -> str:
+        # nodeos error name, like "eosio_assert_message_exception", None if the node gave none
+        try:
+            return e.resp.json()["error"]["name"]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+    def is_action_error(self, e: TransactionException) -> bool:
+        # only errors raised while applying one action are worth isolating by splitting,
+        # expired trx, exhausted cpu payer and the like fail every half the same way
+        return self.error_name(e) in ACTION_ERRORS
+
+    def push_batch(self, actions: List[Action], net_info: Dict = None) -> List[Union[Dict, Exception]]:
+        # on an action error split the batch in halves and retry, until the bad action is alone
+        # any other error is returned for the whole batch, so pushes already done keep their results
+        from requests import RequestException
+        try:
+            resp = self.post_transaction(self.make_batch_transaction(actions, net_info))
+            return [resp] * len(actions)
+        except TransactionException as e:
+            if len(actions) == 1 or not self.is_action_error(e):
+                return [e] * len(actions)
+            middle = len(actions) // 2
+            return self.push_batch(actions[:middle], net_info) + self.push_batch(actions[middle:], net_info)
+        except (EosApiException, RequestException) as e:
+            return [e] * len(actions)
+
+    def push_actions(self, actions: Iterable[Dict], max_actions: int = 50, max_packed_size: int = 64 * 1024,
+                     max_cpu_us: int = 50000, estimate_cpu: Callable[[Action], int] = None
+                     ) -> List[Union[Dict, Exception]]:
+        # group independent actions into as few transactions as the limits allow
+        # returns one item per action, in order: the push response of the transaction that
+        # carried it, or the exception that failed it; nothing is raised once pushing started
+        # chain info is fetched once for the whole call, but each action still costs one
+        # abi_json_to_bin request to serialize its data
+        from requests import RequestException
+        if estimate_cpu is None:
+            estimate_cpu = lambda action: 500
+
+        # transaction header, plus the cpu payer authorization
+        overhead = 32
+        if self.cpu_payer:
+            overhead += 16
+
+        results = []
+        batch = []
+        indexes = []
+        packed_size = overhead
+        cpu_us = 0
+        net_info = None
+
+        def flush():
+            nonlocal net_info
+            try:
+                if net_info is None:
+                    net_info = self.get_info()
+                batch_results = self.push_batch(batch, net_info)
+            except (EosApiException, RequestException) as e:
+                batch_results = [e] * len(batch)
+            for index, result in zip(indexes, batch_results):
+                results[index] = result
+
+        for item in actions:
+            results.append(None)
+            action = Action(
+                account=item["account"],
+                name=item["name"],
+                authorization=[Authorization(actor=auth["actor"], permission=auth["permission"])
+                               for auth in item["authorization"]],
+                data=item["data"],
+            )
+            # an action that can not be serialized fails alone and stays out of the batch
+            try:
+                action.link(self.abi_json_to_bin(action.account, action.name, action.data))
+            except (EosApiException, RequestException) as e:
+                results[-1] = e
+                continue
+            action_size = len(action.pack())
+            action_cpu = estimate_cpu(action)
+
+            if batch and (len(batch) >= max_actions
+                          or packed_size + action_size > max_packed_size
+                          or cpu_us + action_cpu > max_cpu_us):
+                flush()
+                batch = []
+                indexes = []
+                packed_size = overhead
+                cpu_us = 0
+
+            batch.append(action)
+            indexes.append(len(results) - 1)
+            packed_size += action_size
+            cpu_us += action_cpu
+
+        if batch:
+            flush()
+        return results
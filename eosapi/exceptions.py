@@ -1,5 +1,15 @@
-import requests
-from requests import RequestException
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+
+def __getattr__(name: str):
+    # requests is heavy, only load it when RequestException is actually asked for
+    if name == "RequestException":
+        from requests import RequestException
+        return RequestException
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
 
 
 class EosApiException(Exception):
@@ -8,12 +18,12 @@ class EosApiException(Exception):
 
 
 class NodeException(EosApiException):
-    def __init__(self, msg: str, resp: requests.Response):
+    def __init__(self, msg: str, resp: "requests.Response"):
         super().__init__(msg)
         self.resp = resp
 
 
 class TransactionException(EosApiException):
-    def __init__(self, msg, resp: requests.Response):
+    def __init__(self, msg, resp: "requests.Response"):
         super().__init__(msg)
         self.resp = resp
@@ -5,8 +5,7 @@ from .exceptions import EosApiException
 import re
 from typing import List, Tuple
 import hashlib
-from cryptos import hash_to_int, encode_privkey, decode, encode, \
-    hmac, fast_multiply, G, inv, N, decode_privkey, get_privkey_format
+import hmac
 
 class EosType:
     size: int = None
@@ -195,7 +194,9 @@ def get_tapos_info(block_id):
     return ref_block_num, ref_block_prefix
 
 
+# cryptos pulls in its whole coin registry, it is imported on first signature instead of with the packer
 def deterministic_generate_k_nonce(msghash, priv, nonce):
+    from cryptos import hash_to_int, encode_privkey, decode, encode
     v = b'\x01' * 32
     k = b'\x00' * 32
     priv = encode_privkey(priv, 'bin')
@@ -208,6 +209,7 @@ def deterministic_generate_k_nonce(msghash, priv, nonce):
 
 
 def ecdsa_raw_sign_nonce(msghash, priv, nonce):
+    from cryptos import hash_to_int, fast_multiply, G, inv, N, decode_privkey, get_privkey_format
     z = hash_to_int(msghash)
     k = deterministic_generate_k_nonce(msghash, priv, nonce)
 
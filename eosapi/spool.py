@@ -0,0 +1,171 @@
+import os
+import mmap
+import json
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterator, Tuple
+from .packer import Uint16, Uint32
+from .transaction import Transaction
+from .exceptions import EosApiException
+
+# spool file layout, one record per signed transaction:
+#   Uint32 record length (everything below)
+#   Uint32 packed_trx length, packed_trx
+#   Uint16 signature count, then per signature: Uint16 length, ascii signature
+#
+# broadcast results are appended as json lines to "<path>.ack", keyed by record offset
+
+MAX_UINT16 = 0xFFFF
+
+
+@dataclass
+class SpoolEntry:
+    offset: int
+    packed_trx: bytes
+    signatures: List[str] = field(default_factory=list)
+
+
+class TransactionSpool:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ack_path = path + ".ack"
+        self.results: Dict[int, Dict] = {}
+        # torn tails are only cut by the side that writes the file, on its first write,
+        # a reader may be looking at a record another process is still appending
+        self.spool_repaired = False
+        self.ack_repaired = False
+        # append mode creates a missing spool without truncating one another process just made
+        open(self.path, "ab").close()
+        self.load_results()
+
+    def complete_size(self) -> int:
+        # walk the length prefixes up to the last complete record
+        total = os.path.getsize(self.path)
+        offset = 0
+        with open(self.path, "rb") as file:
+            while offset + Uint32.size <= total:
+                file.seek(offset)
+                size = Uint32.unpack(file.read(Uint32.size))
+                if offset + Uint32.size + size > total:
+                    break
+                offset += Uint32.size + size
+        return offset
+
+    def repair(self):
+        # drop a record torn by a crash in the middle of append
+        end = self.complete_size()
+        if end != os.path.getsize(self.path):
+            with open(self.path, "r+b") as file:
+                file.truncate(end)
+        self.spool_repaired = True
+
+    def read_results(self) -> Tuple[Dict[int, Dict], int]:
+        # a line is only complete once its newline is on disk
+        results = {}
+        end = 0
+        if not os.path.exists(self.ack_path):
+            return results, end
+        with open(self.ack_path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    break
+                results[result["offset"]] = result
+                end += len(line)
+        return results, end
+
+    def load_results(self):
+        self.results = self.read_results()[0]
+
+    def repair_results(self):
+        # drop an ack line torn by a crash, its entry is simply still pending
+        self.results, end = self.read_results()
+        if os.path.exists(self.ack_path) and end != os.path.getsize(self.ack_path):
+            with open(self.ack_path, "r+b") as file:
+                file.truncate(end)
+        self.ack_repaired = True
+
+    @staticmethod
+    def pack_entry(packed_trx: bytes, signatures: List[str]) -> bytes:
+        mbytes = b""
+        mbytes += Uint32.pack(len(packed_trx))
+        mbytes += packed_trx
+        if len(signatures) > MAX_UINT16:
+            raise EosApiException("too many signatures to spool: {0}".format(len(signatures)))
+        mbytes += Uint16.pack(len(signatures))
+        for item in signatures:
+            signature = item.encode("ascii")
+            if len(signature) > MAX_UINT16:
+                raise EosApiException("signature too long to spool: {0} bytes".format(len(signature)))
+            mbytes += Uint16.pack(len(signature))
+            mbytes += signature
+        return Uint32.pack(len(mbytes)) + mbytes
+
+    @staticmethod
+    def unpack_entry(offset: int, mbytes: bytes) -> SpoolEntry:
+        pos = 0
+        trx_size = Uint32.unpack(mbytes[pos:])
+        pos += Uint32.size
+        packed_trx = bytes(mbytes[pos: pos + trx_size])
+        pos += trx_size
+        count = Uint16.unpack(mbytes[pos:])
+        pos += Uint16.size
+        signatures = []
+        for i in range(0, count):
+            size = Uint16.unpack(mbytes[pos:])
+            pos += Uint16.size
+            signatures.append(bytes(mbytes[pos: pos + size]).decode("ascii"))
+            pos += size
+        if pos != len(mbytes):
+            raise EosApiException("corrupt spool record at offset {0}".format(offset))
+        return SpoolEntry(offset=offset, packed_trx=packed_trx, signatures=signatures)
+
+    def append(self, packed_trx: bytes, signatures: List[str]) -> int:
+        mbytes = self.pack_entry(packed_trx, signatures)
+        if not self.spool_repaired:
+            self.repair()
+        with open(self.path, "ab") as file:
+            offset = file.tell()
+            file.write(mbytes)
+            file.flush()
+            os.fsync(file.fileno())
+        return offset
+
+    def append_transaction(self, trx: Transaction) -> int:
+        if not trx.signatures:
+            raise EosApiException("transaction is not signed")
+        return self.append(trx.pack(), trx.signatures)
+
+    def entries(self) -> Iterator[SpoolEntry]:
+        if os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                offset = 0
+                total = len(view)
+                while offset + Uint32.size <= total:
+                    size = Uint32.unpack(view[offset: offset + Uint32.size])
+                    start = offset + Uint32.size
+                    if start + size > total:
+                        break
+                    entry = self.unpack_entry(offset, view[start: start + size])
+                    offset = start + size
+                    yield entry
+
+    def pending(self) -> Iterator[SpoolEntry]:
+        for entry in self.entries():
+            if entry.offset not in self.results:
+                yield entry
+
+    def record(self, offset: int, result: Dict):
+        result = dict(result, offset=offset)
+        if not self.ack_repaired:
+            self.repair_results()
+        with open(self.ack_path, "a") as file:
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.results[offset] = result
@@ -2,7 +2,6 @@ from dataclasses import dataclass, field
 from .packer import *
 from typing import List, Dict
 import hashlib
-from base58 import b58encode
 import json
 
 @dataclass
@@ -132,6 +131,7 @@ class Transaction:
         return self.unpack_signature(signature)
 
     def unpack_signature(self, signature: bytes):
+        from base58 import b58encode
         t = Uint8.unpack(signature)
         if t == 0:
             data = signature[Uint8.size: Uint8.size + 65]
@@ -0,0 +1,168 @@
+import pytest
+from requests import ConnectionError
+from eosapi import EosApi, Action, Authorization, NodeException, TransactionException
+
+PRIVATE_KEY = "5KWxgG4rPEXzHnRBaiVRCCE6WAfnqkRpTu1uHzJoQRzixqBB1k3"
+
+
+class FakeResponse:
+
+    def __init__(self, error_name: str):
+        self.error_name = error_name
+
+    def json(self):
+        return {"code": 500, "error": {"name": self.error_name}}
+
+
+def make_api(reject=lambda packed_trx: None, fail_at: int = None, error: Exception = None):
+    api = EosApi()
+    api.import_key("consumer1111", PRIVATE_KEY)
+    pushes = []
+    api.info_calls = 0
+
+    def abi_json_to_bin(code, action, args):
+        if args["memo"] == "baddata":
+            raise TransactionException("abi_json_to_bin failed", FakeResponse("invalid_action_args_exception"))
+        return args["memo"].encode("ascii")
+
+    def post_packed_transaction(packed_trx, signatures, *args):
+        pushes.append(signatures)
+        if len(pushes) == fail_at:
+            raise error
+        error_name = reject(packed_trx)
+        if error_name:
+            raise TransactionException("transaction error", FakeResponse(error_name))
+        return {"transaction_id": "trx{0}".format(len(pushes))}
+
+    def get_info():
+        api.info_calls += 1
+        return {"last_irreversible_block_id": "00" * 32, "chain_id": "11" * 32}
+
+    api.abi_json_to_bin = abi_json_to_bin
+    api.get_info = get_info
+    api.post_packed_transaction = post_packed_transaction
+    return api, pushes
+
+
+def make_actions(count: int, memo=lambda i: "memo{0}".format(i)):
+    return [{
+        "account": "eosio.token",
+        "name": "transfer",
+        "authorization": [{"actor": "consumer1111", "permission": "active"}],
+        "data": {"memo": memo(i)},
+    } for i in range(count)]
+
+
+def test_batches_by_action_count():
+    api, pushes = make_api()
+    results = api.push_actions(make_actions(25), max_actions=10)
+    assert len(pushes) == 3
+    # one signature per batch, whatever the number of authorizations
+    assert all(len(item) == 1 for item in pushes)
+    assert [item["transaction_id"] for item in results] == ["trx1"] * 10 + ["trx2"] * 10 + ["trx3"] * 5
+
+
+def test_batches_by_packed_size_and_cpu():
+    # each action packs to 39 bytes with a 5 byte memo, plus 32 bytes of transaction overhead:
+    # 32 + 4 * 39 = 188 fits in 200, a fifth action does not
+    api, pushes = make_api()
+    results = api.push_actions(make_actions(10), max_packed_size=200)
+    assert len(pushes) == 3
+    assert [item["transaction_id"] for item in results] == ["trx1"] * 4 + ["trx2"] * 4 + ["trx3"] * 2
+
+    api, pushes = make_api()
+    api.push_actions(make_actions(10), max_cpu_us=1000, estimate_cpu=lambda action: 400)
+    assert len(pushes) == 5
+
+
+def test_isolates_failing_action():
+    api, pushes = make_api(lambda packed_trx: "eosio_assert_message_exception" if b"bad" in packed_trx else None)
+    results = api.push_actions(make_actions(20, lambda i: "bad" if i == 13 else "ok"), max_actions=10)
+    assert isinstance(results[13], TransactionException)
+    assert all(isinstance(item, dict) for i, item in enumerate(results) if i != 13)
+
+
+def test_batch_wide_error_is_not_split():
+    api, pushes = make_api(lambda packed_trx: "expired_tx_exception")
+    results = api.push_actions(make_actions(20), max_actions=10)
+    assert len(pushes) == 2
+    assert all(isinstance(item, TransactionException) for item in results)
+
+
+def test_bad_data_fails_alone():
+    api, pushes = make_api()
+    results = api.push_actions(make_actions(120, lambda i: "baddata" if i == 70 else "ok"))
+    assert len(results) == 120
+    assert isinstance(results[70], TransactionException)
+    assert all(isinstance(item, dict) for i, item in enumerate(results) if i != 70)
+    assert len(pushes) == 3
+
+
+def test_cpu_payer():
+    api, pushes = make_api()
+    api.set_cpu_payer("payer1111111", PRIVATE_KEY)
+    actions = make_actions(10)
+    # the payer authorization adds 16 bytes: 48 + 3 * 39 = 165 fits in 200, a fourth action does not
+    results = api.push_actions(actions, max_packed_size=200)
+    assert len(pushes) == 4
+    assert [item["transaction_id"] for item in results] == ["trx1"] * 3 + ["trx2"] * 3 + ["trx3"] * 3 + ["trx4"]
+    # same key for payer and actor, still one signature
+    assert all(len(item) == 1 for item in pushes)
+    assert all(item["authorization"] == [{"actor": "consumer1111", "permission": "active"}] for item in actions)
+
+
+def test_cpu_payer_does_not_change_actions():
+    api, pushes = make_api()
+    api.set_cpu_payer("payer1111111", PRIVATE_KEY)
+    action = Action("eosio.token", "transfer", [Authorization("consumer1111")], binargs=b"memo")
+    trx = api.make_batch_transaction([action])
+    assert [item.actor for item in trx.actions[0].authorization] == ["payer1111111", "consumer1111"]
+    assert [item.actor for item in action.authorization] == ["consumer1111"]
+
+
+def test_chain_info_fetched_once():
+    api, pushes = make_api(lambda packed_trx: "eosio_assert_message_exception" if b"bad" in packed_trx else None)
+    api.push_actions(make_actions(500, lambda i: "bad" if i == 260 else "ok"))
+    assert api.info_calls == 1
+    # 10 batches, plus the splits isolating the bad action
+    assert len(pushes) > 10
+
+
+@pytest.mark.parametrize("error", [NodeException("bad http status code: 502", None), ConnectionError("reset")])
+def test_failure_keeps_earlier_results(error):
+    api, pushes = make_api(fail_at=3, error=error)
+    results = api.push_actions(make_actions(150))
+    assert len(pushes) == 3
+    assert [item["transaction_id"] for item in results[:100]] == ["trx1"] * 50 + ["trx2"] * 50
+    assert all(item is error for item in results[100:])
+
+
+def test_get_info_failure_fails_batch_only():
+    api, pushes = make_api()
+    calls = []
+
+    def get_info():
+        calls.append(1)
+        if len(calls) == 1:
+            raise NodeException("bad http status code: 502", None)
+        return {"last_irreversible_block_id": "00" * 32, "chain_id": "11" * 32}
+
+    api.get_info = get_info
+    results = api.push_actions(make_actions(20), max_actions=10)
+    assert all(isinstance(item, NodeException) for item in results[:10])
+    assert [item["transaction_id"] for item in results[10:]] == ["trx1"] * 10
+
+
+def test_serialization_node_error_fails_alone():
+    api, pushes = make_api()
+    abi_json_to_bin = api.abi_json_to_bin
+
+    def flaky_abi_json_to_bin(code, action, args):
+        if args["memo"] == "down":
+            raise NodeException("eos node error, not find binargs", None)
+        return abi_json_to_bin(code, action, args)
+
+    api.abi_json_to_bin = flaky_abi_json_to_bin
+    results = api.push_actions(make_actions(5, lambda i: "down" if i == 2 else "ok"))
+    assert isinstance(results[2], NodeException)
+    assert [item["transaction_id"] for i, item in enumerate(results) if i != 2] == ["trx1"] * 4
@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+# startup budgets in milliseconds, measured in a fresh interpreter
+PACKAGE_BUDGET_MS = 100
+SERIALIZATION_BUDGET_MS = 60
+# only needed to sign or to talk to a node, must not be loaded by a plain import
+LAZY_MODULES = ["requests", "cryptos", "base58"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# a bare eosapi package is registered first when timing a submodule, so that
+# eosapi/__init__.py and the rest of the package are not part of the figure
+SCRIPT = """
+import sys, time, types, json
+module, isolated = sys.argv[1], sys.argv[2] == "1"
+if isolated:
+    package = types.ModuleType("eosapi")
+    package.__path__ = [{path!r}]
+    sys.modules["eosapi"] = package
+start = time.perf_counter()
+__import__(module)
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, isolated: bool) -> dict:
+    script = SCRIPT.format(path=os.path.join(ROOT, "eosapi"), lazy=LAZY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-c", script, module, "1" if isolated else "0"],
+        stdout=subprocess.PIPE, universal_newlines=True, check=True, cwd=ROOT,
+    )
+    return json.loads(proc.stdout)
+
+
+def test_import_package():
+    result = measure("eosapi", isolated=False)
+    assert result["loaded"] == []
+    assert result["ms"] < PACKAGE_BUDGET_MS
+
+
+@pytest.mark.parametrize("module", ["eosapi.packer", "eosapi.transaction"])
+def test_import_serialization(module):
+    result = measure(module, isolated=True)
+    assert result["loaded"] == []
+    assert result["ms"] < SERIALIZATION_BUDGET_MS
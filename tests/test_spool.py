@@ -0,0 +1,170 @@
+import json
+import hashlib
+import pytest
+from eosapi import EosApi, EosApiException, NodeException, TransactionException, TransactionSpool
+
+
+class FakeResponse:
+
+    def __init__(self, error_name: str):
+        self.error_name = error_name
+
+    def json(self):
+        return {"code": 500, "error": {"name": self.error_name}}
+
+
+def append_torn(path: str, data: bytes):
+    with open(path, "ab") as file:
+        file.write(data)
+
+
+def fake_node(api: EosApi, fail_at: int = None):
+    calls = []
+
+    def post_packed_transaction(packed_trx, signatures, *args):
+        calls.append(packed_trx)
+        if len(calls) == fail_at:
+            raise NodeException("node down", None)
+        return {"transaction_id": packed_trx.hex()}
+
+    api.post_packed_transaction = post_packed_transaction
+    return calls
+
+
+def test_round_trip(tmp_path):
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    first = spool.append(b"\x01\x02\x03", ["SIG_K1_abc", "SIG_K1_def"])
+    second = spool.append(b"\x04", [])
+    entries = list(TransactionSpool(spool.path).entries())
+    assert [item.offset for item in entries] == [first, second]
+    assert entries[0].packed_trx == b"\x01\x02\x03"
+    assert entries[0].signatures == ["SIG_K1_abc", "SIG_K1_def"]
+    assert entries[1].signatures == []
+
+
+def test_long_signature(tmp_path):
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    signature = "SIG_WA_" + "a" * 600
+    spool.append(b"\x01", [signature])
+    assert list(spool.entries())[0].signatures == [signature]
+    with pytest.raises(EosApiException):
+        spool.append(b"\x01", ["SIG_WA_" + "a" * 0x10000])
+
+
+def test_reader_keeps_torn_record(tmp_path):
+    path = str(tmp_path / "trx.spool")
+    TransactionSpool(path).append(b"\x01", [])
+    append_torn(path, b"\x10\x00\x00\x00ab")
+    size = len(open(path, "rb").read())
+
+    # another process may still be writing the record, a reader must not cut it
+    reader = TransactionSpool(path)
+    assert len(list(reader.entries())) == 1
+    assert len(open(path, "rb").read()) == size
+
+    # the writer drops it before its first append
+    writer = TransactionSpool(path)
+    writer.append(b"\x02", [])
+    assert [item.packed_trx for item in writer.entries()] == [b"\x01", b"\x02"]
+
+
+def test_drain_resumes_after_node_error(tmp_path):
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    for item in (b"\x01", b"\x02", b"\x03"):
+        spool.append(item, [])
+
+    api = EosApi()
+    calls = fake_node(api, fail_at=2)
+    with pytest.raises(NodeException):
+        api.drain_spool(spool)
+
+    calls = fake_node(api)
+    results = api.drain_spool(TransactionSpool(spool.path))
+    assert calls == [b"\x02", b"\x03"]
+    assert [item["transaction_id"] for item in results] == ["02", "03"]
+
+
+def reject_with(api: EosApi, error_name: str):
+    calls = []
+
+    def post_packed_transaction(packed_trx, signatures, *args):
+        calls.append(packed_trx)
+        raise TransactionException(error_name, FakeResponse(error_name))
+
+    api.post_packed_transaction = post_packed_transaction
+    return calls
+
+
+def test_drain_records_rejected_transactions(tmp_path):
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    spool.append(b"\x01", [])
+
+    api = EosApi()
+    reject_with(api, "expired_tx_exception")
+    results = api.drain_spool(spool)
+    assert results[0]["error"] == "expired_tx_exception"
+    assert list(TransactionSpool(spool.path).pending()) == []
+
+
+@pytest.mark.parametrize("error_name", ["tx_cpu_usage_exceeded", "leeway_deadline_exception", None])
+def test_drain_keeps_transient_errors_pending(tmp_path, error_name):
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    spool.append(b"\x01", [])
+    spool.append(b"\x02", [])
+
+    api = EosApi()
+    calls = reject_with(api, error_name)
+    results = api.drain_spool(spool)
+    assert calls == [b"\x01", b"\x02"]
+    assert all(item["retry"] for item in results)
+
+    spool = TransactionSpool(spool.path)
+    assert len(list(spool.pending())) == 2
+    calls = fake_node(api)
+    api.drain_spool(spool)
+    assert calls == [b"\x01", b"\x02"]
+
+
+def test_drain_confirms_duplicate_after_lost_ack(tmp_path):
+    # the push went through but the broadcaster crashed before writing its ack
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    spool.append(b"\x01\x02", [])
+
+    api = EosApi()
+    reject_with(api, "tx_duplicate")
+    results = api.drain_spool(TransactionSpool(spool.path))
+    assert results[0]["transaction_id"] == hashlib.sha256(b"\x01\x02").hexdigest()
+    assert "error" not in results[0]
+    assert list(TransactionSpool(spool.path).pending()) == []
+
+
+def test_open_does_not_truncate(tmp_path):
+    path = str(tmp_path / "trx.spool")
+    TransactionSpool(path).append(b"\x01", [])
+    assert len(list(TransactionSpool(path).entries())) == 1
+
+
+@pytest.mark.parametrize("torn", [b'{"offs', b'{"offset": 9999}'])
+def test_torn_ack_line(tmp_path, torn):
+    spool = TransactionSpool(str(tmp_path / "trx.spool"))
+    for item in (b"\x01", b"\x02", b"\x03"):
+        spool.append(item, [])
+
+    api = EosApi()
+    fake_node(api, fail_at=3)
+    with pytest.raises(NodeException):
+        api.drain_spool(spool)
+    # crash while writing the next ack line, valid json without its newline is still torn
+    append_torn(spool.ack_path, torn)
+
+    spool = TransactionSpool(spool.path)
+    assert len(spool.results) == 2
+    calls = fake_node(api)
+    api.drain_spool(spool)
+    assert calls == [b"\x03"]
+
+    spool = TransactionSpool(spool.path)
+    assert list(spool.pending()) == []
+    with open(spool.ack_path, "rb") as file:
+        lines = file.read().splitlines()
+    assert [json.loads(line)["transaction_id"] for line in lines] == ["01", "02", "03"]